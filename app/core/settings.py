@@ -1,7 +1,8 @@
 import json
 import os
+import re
 import tempfile
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -30,6 +31,22 @@ class Settings(BaseSettings):
     hana_ssl_validate: bool = Field(default=False)
     hana_cert_path: Optional[str] = None
 
+    # Endpoint HANA secundario de solo lectura (opcional).
+    # Usuario/contraseña/TLS se heredan del primario si no se definen.
+    hana_read_host: Optional[str] = None
+    hana_read_port: Optional[int] = None
+    hana_read_user: Optional[str] = None
+    hana_read_password: Optional[str] = None
+    hana_read_cert_path: Optional[str] = None
+    # Máximo de conexiones simultáneas al secundario y espera (s) por una libre
+    hana_read_pool_size: int = Field(default=5, ge=1)
+    hana_read_pool_timeout: float = Field(default=10.0, ge=0)
+    # Segundos que el secundario queda fuera de servicio tras un fallo de conexión
+    hana_read_retry_seconds: float = Field(default=30.0, ge=0)
+    # Overrides por ruta: "nombre_funcion_o_path_completo=read|primary,..."
+    # p. ej. "list_ee_site=primary,/snbrns-hub/hana/sql/ee-site=primary"
+    hana_route_overrides: Optional[str] = None
+
     # CORS
     cors_allow_origins: Optional[str] = Field(default=None, env="CORS_ALLOW_ORIGINS")
     cors_allow_methods: Optional[str] = Field(default=None, env="CORS_ALLOW_METHODS")
@@ -41,6 +58,7 @@ class Settings(BaseSettings):
         env_file_encoding="utf-8",
         case_sensitive=False,
         extra="ignore",
+        env_ignore_empty=True,
     )
 
     def hana_connection_kwargs(self) -> Dict[str, Any]:
@@ -58,30 +76,120 @@ class Settings(BaseSettings):
         # Elimina claves None
         return {k: v for k, v in kwargs.items() if v is not None}
 
+    def hana_read_enabled(self) -> bool:
+        """Indica si hay un endpoint secundario de solo lectura configurado."""
+        return bool(self.hana_read_host and self.hana_read_port)
+
+    def hana_read_connection_kwargs(self) -> Dict[str, Any]:
+        """Kwargs de conexión para el endpoint de solo lectura.
+
+        Parte de los kwargs del primario y sustituye host/port y, si existen,
+        las credenciales y el certificado propios del secundario.
+        """
+        kwargs = self.hana_connection_kwargs()
+        kwargs["address"] = self.hana_read_host
+        kwargs["port"] = int(self.hana_read_port) if self.hana_read_port else None
+        if self.hana_read_user:
+            kwargs["user"] = self.hana_read_user
+        if self.hana_read_password:
+            kwargs["password"] = self.hana_read_password
+        if self.hana_read_cert_path:
+            kwargs["sslTrustStore"] = self.hana_read_cert_path
+        return {k: v for k, v in kwargs.items() if v is not None}
+
+    def hana_route_overrides_map(self) -> Dict[str, str]:
+        """Parsea `hana_route_overrides` a un dict {ruta: "read"|"primary"}.
+
+        La clave puede ser el nombre de la función del endpoint o el path completo
+        de la petición, incluido el prefijo global (p. ej. "/snbrns-hub/hana/sql/ee-site").
+        Entradas con destino desconocido se ignoran.
+        """
+        overrides: Dict[str, str] = {}
+        if not self.hana_route_overrides:
+            return overrides
+        for item in self.hana_route_overrides.split(","):
+            key, sep, target = item.partition("=")
+            key, target = key.strip(), target.strip().lower()
+            if sep and key and target in ("read", "primary"):
+                overrides[key] = target
+        return overrides
+
+
+def _is_read_only_entry(entry: Dict[str, Any]) -> bool:
+    """Indica si una instancia de servicio VCAP está marcada como de solo lectura.
+
+    Se considera de solo lectura si alguno de sus `tags` es exactamente
+    'read-only', 'readonly' o 'replica', o si su `name` contiene 'readonly' o
+    'replica' como palabra completa (separada por '-' o '_') o la secuencia
+    'read-only'/'read_only'.
+    """
+    markers = {"read-only", "readonly", "replica"}
+    tags = {str(t).lower() for t in entry.get("tags") or []}
+    if tags & markers:
+        return True
+    tokens = [t for t in re.split(r"[-_]", str(entry.get("name") or "").lower()) if t]
+    if "readonly" in tokens or "replica" in tokens:
+        return True
+    return any(a == "read" and b == "only" for a, b in zip(tokens, tokens[1:]))
 
-def _extract_hana_from_vcap(vcap_services: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Intenta extraer credenciales HANA desde VCAP_SERVICES.
 
-    Busca claves típicas de servicio: 'hana', 'hanatrial', 'sap-hana'.
-    Devuelve el dict `credentials` del primer servicio encontrado.
+def _hana_service_entries(vcap_services: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Devuelve las instancias de servicios HANA en orden de preferencia.
+
+    Primero las claves típicas ('hana', 'hanatrial', 'sap-hana') y luego
+    cualquier otro servicio con 'hana' en el nombre.
     """
     candidate_keys = ["hana", "hanatrial", "sap-hana"]
-    for key in candidate_keys:
-        if key in vcap_services and isinstance(vcap_services[key], list) and vcap_services[key]:
-            entry = vcap_services[key][0]
-            creds = entry.get("credentials") or {}
-            if creds:
-                return creds
-    # Si no se encontraron claves conocidas, intenta cualquier servicio con 'hana' en nombre
-    for key, services in vcap_services.items():
-        if "hana" in key and isinstance(services, list) and services:
-            entry = services[0]
-            creds = entry.get("credentials") or {}
-            if creds:
-                return creds
+    keys = [k for k in candidate_keys if k in vcap_services]
+    keys += [k for k in vcap_services if "hana" in k and k not in candidate_keys]
+    entries: List[Dict[str, Any]] = []
+    for key in keys:
+        services = vcap_services[key]
+        if isinstance(services, list):
+            entries.extend(e for e in services if isinstance(e, dict))
+    return entries
+
+
+def _split_hana_entries(vcap_services: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Separa las instancias HANA en candidatas a primario y a solo lectura.
+
+    Si todas están marcadas como de solo lectura, la primera se usa como
+    primario (comportamiento previo) y no como secundario.
+    """
+    entries = _hana_service_entries(vcap_services)
+    read_entries = [e for e in entries if _is_read_only_entry(e)]
+    primary_entries = [e for e in entries if not _is_read_only_entry(e)]
+    if not primary_entries and read_entries:
+        primary_entries, read_entries = read_entries[:1], read_entries[1:]
+    return primary_entries, read_entries
+
+
+def _first_credentials(entries: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    for entry in entries:
+        creds = entry.get("credentials") or {}
+        if creds:
+            return creds
     return None
 
 
+def _extract_hana_from_vcap(vcap_services: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Intenta extraer credenciales HANA desde VCAP_SERVICES.
+
+    Devuelve el dict `credentials` del primer servicio HANA que no esté
+    marcado como de solo lectura (o del primero, si todos lo están).
+    """
+    return _first_credentials(_split_hana_entries(vcap_services)[0])
+
+
+def _extract_hana_read_from_vcap(vcap_services: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Intenta extraer credenciales del endpoint HANA de solo lectura desde VCAP_SERVICES.
+
+    Devuelve el dict `credentials` del primer servicio HANA marcado como de
+    solo lectura (ver `_is_read_only_entry`), o None si no hay ninguno.
+    """
+    return _first_credentials(_split_hana_entries(vcap_services)[1])
+
+
 def _write_certificate_tmp_if_present(credentials: Dict[str, Any]) -> Optional[str]:
     """Escribe el certificado en un archivo temporal si está presente en las credenciales.
 
@@ -110,8 +218,12 @@ def load_settings() -> Settings:
         try:
             vcap = json.loads(vcap_raw)
             creds = _extract_hana_from_vcap(vcap)
-            if creds:
+            read_creds = _extract_hana_read_from_vcap(vcap)
+            if creds or read_creds:
+                creds = creds or {}
+                read_creds = read_creds or {}
                 cert_path = _write_certificate_tmp_if_present(creds)
+                read_cert_path = _write_certificate_tmp_if_present(read_creds)
                 # Crear una nueva instancia con overrides desde VCAP
                 base = Settings(
                     hana_host=creds.get("host") or creds.get("hostname") or base.hana_host,
@@ -122,6 +234,15 @@ def load_settings() -> Settings:
                     hana_encrypt=bool(creds.get("encrypt", base.hana_encrypt)),
                     hana_ssl_validate=bool(creds.get("sslValidateCertificate", base.hana_ssl_validate)),
                     hana_cert_path=cert_path or base.hana_cert_path,
+                    hana_read_host=read_creds.get("host") or read_creds.get("hostname") or base.hana_read_host,
+                    hana_read_port=int(read_creds.get("port")) if read_creds.get("port") else base.hana_read_port,
+                    hana_read_user=read_creds.get("user") or read_creds.get("username") or base.hana_read_user,
+                    hana_read_password=read_creds.get("password") or base.hana_read_password,
+                    hana_read_cert_path=read_cert_path or base.hana_read_cert_path,
+                    hana_read_pool_size=base.hana_read_pool_size,
+                    hana_read_pool_timeout=base.hana_read_pool_timeout,
+                    hana_read_retry_seconds=base.hana_read_retry_seconds,
+                    hana_route_overrides=base.hana_route_overrides,
                     app_name=base.app_name,
                     environment=os.getenv("ENV", base.environment),
                 )
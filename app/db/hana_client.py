@@ -1,23 +1,195 @@
+import logging
+import threading
+import time
 from contextlib import contextmanager
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from hdbcli import dbapi
 
 from app.core.settings import Settings
 
 
+logger = logging.getLogger(__name__)
+
+
 class HanaClientError(Exception):
     pass
 
 
+class HanaEndpointUnavailableError(HanaClientError):
+    """El endpoint no acepta conexiones (caído o en ventana de reintento)."""
+
+
+class HanaConnectionLostError(HanaClientError):
+    """La conexión se perdió durante la operación (no es un error de SQL)."""
+
+
+class HanaStaleConnectionError(HanaConnectionLostError):
+    """Se perdió una conexión reutilizada del pool; el endpoint puede seguir sano."""
+
+
+# Códigos hdbcli de conexión caída/rechazada
+_CONNECTION_ERROR_CODES = {-10709, -10807, -10108}
+
+
+def _is_connection_failure(conn, exc: BaseException) -> bool:
+    """Indica si `exc` se debe a la conexión y no a la sentencia."""
+    for err in (exc, exc.__cause__):
+        if getattr(err, "errorcode", None) in _CONNECTION_ERROR_CODES:
+            return True
+    try:
+        return not conn.isconnected()
+    except Exception:
+        return True
+
+
+class HanaConnectionPool:
+    """Pool acotado de conexiones HANA para un endpoint concreto.
+
+    Como máximo `max_size` conexiones abiertas a la vez; `acquire` espera
+    hasta `timeout` segundos por una libre. Si el endpoint falla a nivel de
+    conexión se marca como no disponible durante `retry_seconds`; mientras
+    tanto `acquire` falla de inmediato para que el llamador pueda recurrir
+    a otro endpoint.
+    """
+
+    def __init__(
+        self,
+        connect_kwargs: Dict[str, Any],
+        max_size: int = 5,
+        retry_seconds: float = 30.0,
+        timeout: float = 10.0,
+    ):
+        self.connect_kwargs = connect_kwargs
+        self.max_size = max_size
+        self.retry_seconds = retry_seconds
+        self.timeout = timeout
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._unhealthy_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self._unhealthy_until
+
+    def mark_unhealthy(self) -> None:
+        self._unhealthy_until = time.monotonic() + self.retry_seconds
+        self.close_all()
+
+    def acquire(self, fresh: bool = False):
+        return self.checkout(fresh=fresh)[0]
+
+    def checkout(self, fresh: bool = False) -> Tuple[Any, bool]:
+        """Toma una conexión del pool y devuelve `(conn, reutilizada)`.
+
+        Con `fresh=True` se ignoran las conexiones ociosas y se abre una nueva.
+        """
+        if not self.healthy:
+            raise HanaEndpointUnavailableError("Endpoint HANA no disponible temporalmente.")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HanaClientError(f"Pool HANA agotado ({self.max_size} conexiones en uso).")
+        try:
+            return self._checkout(fresh)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkout(self, fresh: bool) -> Tuple[Any, bool]:
+        while not fresh:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                break
+            try:
+                if conn.isconnected():
+                    return conn, True
+            except Exception:
+                pass
+            self._close(conn)
+        try:
+            return dbapi.connect(**self.connect_kwargs), False
+        except Exception as exc:
+            self.mark_unhealthy()
+            raise HanaEndpointUnavailableError(str(exc)) from exc
+
+    def release(self, conn, discard: bool = False) -> None:
+        try:
+            if discard or not self.healthy:
+                self._close(conn)
+            else:
+                with self._lock:
+                    self._idle.append(conn)
+        finally:
+            self._slots.release()
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+    @staticmethod
+    def _close(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
 class HanaClient:
-    """Cliente HANA con helpers para consultas y procedimientos."""
+    """Cliente HANA con helpers para consultas y procedimientos.
+
+    Sin `pool`, abre una conexión al primario por operación. Con `pool`, toma
+    las conexiones del pool y, si el endpoint no está disponible, usa
+    `fallback` (normalmente el cliente del primario).
+    """
 
-    def __init__(self, settings: Settings):
+    def __init__(
+        self,
+        settings: Settings,
+        pool: Optional[HanaConnectionPool] = None,
+        fallback: Optional["HanaClient"] = None,
+    ):
         self.settings = settings
+        self.pool = pool
+        self.fallback = fallback
+
+    @contextmanager
+    def _connection(self, fresh: bool = False):
+        if self.pool is None:
+            with self._direct_connection() as conn:
+                yield conn
+            return
+        try:
+            conn, reused = self.pool.checkout(fresh=fresh)
+        except HanaEndpointUnavailableError as exc:
+            # Sólo se recurre al primario si el endpoint está caído, no si el pool está lleno
+            if self.fallback is None:
+                raise
+            logger.warning("Endpoint HANA de lectura no disponible, usando primario: %s", exc)
+            with self.fallback._connection() as conn:
+                yield conn
+            return
+        discard = False
+        try:
+            yield conn
+        except Exception as exc:
+            # Ante cualquier error no se devuelve la conexión al pool
+            discard = True
+            if _is_connection_failure(conn, exc):
+                # Una conexión ociosa puede haber sido cerrada por el servidor sin
+                # que el endpoint esté caído; sólo una conexión nueva lo confirma.
+                if reused:
+                    raise HanaStaleConnectionError(str(exc)) from exc
+                self.pool.mark_unhealthy()
+                raise HanaConnectionLostError(str(exc)) from exc
+            raise HanaClientError(str(exc)) from exc
+        finally:
+            self.pool.release(conn, discard=discard)
 
     @contextmanager
-    def _connection(self):
+    def _direct_connection(self):
         conn = None
         try:
             kwargs = self.settings.hana_connection_kwargs()
@@ -35,8 +207,27 @@ class HanaClient:
                 pass
 
     def execute_query(self, sql: str, params: Optional[Iterable[Any]] = None) -> List[Dict[str, Any]]:
-        """Ejecuta una consulta SELECT y devuelve lista de diccionarios."""
-        with self._connection() as conn:
+        """Ejecuta una consulta SELECT y devuelve lista de diccionarios.
+
+        Si se pierde una conexión reutilizada del pool, se reintenta una vez con
+        una conexión nueva del mismo pool; si ésta también falla, se reintenta
+        una vez en `fallback`.
+        """
+        params = list(params) if params is not None else None
+        try:
+            try:
+                return self._execute_query(sql, params)
+            except HanaStaleConnectionError as exc:
+                logger.info("Conexión HANA ociosa perdida, reintentando con una nueva: %s", exc)
+                return self._execute_query(sql, params, fresh=True)
+        except HanaConnectionLostError as exc:
+            if self.fallback is None:
+                raise
+            logger.warning("Conexión HANA de lectura perdida, reintentando en primario: %s", exc)
+            return self.fallback.execute_query(sql, params)
+
+    def _execute_query(self, sql: str, params: Optional[List[Any]] = None, fresh: bool = False) -> List[Dict[str, Any]]:
+        with self._connection(fresh=fresh) as conn:
             cursor = conn.cursor()
             try:
                 if params:
@@ -1,7 +1,10 @@
 from functools import lru_cache
+from typing import Optional
+
+from fastapi import Request
 
 from app.core.settings import Settings, load_settings
-from app.db.hana_client import HanaClient
+from app.db.hana_client import HanaClient, HanaConnectionPool
 
 
 @lru_cache(maxsize=1)
@@ -9,6 +12,48 @@ def get_settings() -> Settings:
     return load_settings()
 
 
-def get_hana_client() -> HanaClient:
+@lru_cache(maxsize=1)
+def get_hana_read_pool() -> Optional[HanaConnectionPool]:
+    """Pool del endpoint de solo lectura, o None si no está configurado."""
+    settings = get_settings()
+    if not settings.hana_read_enabled():
+        return None
+    return HanaConnectionPool(
+        settings.hana_read_connection_kwargs(),
+        max_size=settings.hana_read_pool_size,
+        retry_seconds=settings.hana_read_retry_seconds,
+        timeout=settings.hana_read_pool_timeout,
+    )
+
+
+def _route_target(request: Request, default: str) -> str:
+    """Resuelve el destino ("read"/"primary") de la ruta actual aplicando overrides.
+
+    Los overrides se buscan por nombre de la función del endpoint y por el path
+    completo de la petición (con el prefijo global, p. ej. "/snbrns-hub/...").
+    """
+    overrides = get_settings().hana_route_overrides_map()
+    route = request.scope.get("route")
+    for key in (getattr(route, "name", None), request.scope.get("path")):
+        if key and key in overrides:
+            return overrides[key]
+    return default
+
+
+def _client_for(target: str) -> HanaClient:
     settings = get_settings()
-    return HanaClient(settings)
\ No newline at end of file
+    primary = HanaClient(settings)
+    pool = get_hana_read_pool()
+    if target == "read" and pool is not None:
+        return HanaClient(settings, pool=pool, fallback=primary)
+    return primary
+
+
+def get_hana_client(request: Request) -> HanaClient:
+    """Cliente del primario; usar en procedimientos y escrituras."""
+    return _client_for(_route_target(request, "primary"))
+
+
+def get_hana_read_client(request: Request) -> HanaClient:
+    """Cliente del endpoint de solo lectura con fallback al primario."""
+    return _client_for(_route_target(request, "read"))
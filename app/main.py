@@ -85,6 +85,8 @@ def create_app() -> FastAPI:
                 "schema": settings.hana_schema,
                 "encrypt": settings.hana_encrypt,
                 "ssl_validate": settings.hana_ssl_validate,
+                "read_host": settings.hana_read_host,
+                "read_port": settings.hana_read_port,
             },
             "links": {
                 "docs": "/docs",
@@ -3,7 +3,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.db.hana_client import HanaClient, HanaClientError
-from app.dependencies import get_hana_client, get_settings
+from app.dependencies import get_hana_read_client, get_settings
 
 
 router = APIRouter(prefix="/hana/sql", tags=["HANA SQL"])
@@ -12,7 +12,7 @@ router = APIRouter(prefix="/hana/sql", tags=["HANA SQL"])
 @router.get("/ee-site")
 def list_ee_site(
     limit: int = Query(10, ge=1, le=1000),
-    client: HanaClient = Depends(get_hana_client),
+    client: HanaClient = Depends(get_hana_read_client),
 ):
     """Devuelve hasta 'limit' filas de GLOBALHITSS_EE_SITE."""
     settings = get_settings()
@@ -0,0 +1,337 @@
+"""Pruebas del enrutado de lecturas a un endpoint HANA secundario con un dbapi falso."""
+import json
+import os
+
+import pytest
+from hdbcli import dbapi
+
+from app import dependencies
+from app.core.settings import (
+    Settings,
+    _extract_hana_from_vcap,
+    _extract_hana_read_from_vcap,
+    load_settings,
+)
+from app.db.hana_client import HanaClient, HanaClientError, HanaConnectionPool
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+
+    def execute(self, sql, params=None):
+        self.conn.target.executed.append((self.conn.address, sql))
+        self.conn.target.maybe_drop(self.conn)
+        if "BAD" in sql:
+            raise RuntimeError("syntax error")
+        self.description = [("HOST",)]
+
+    def callproc(self, name, params):
+        self.conn.target.executed.append((self.conn.address, f"CALL {name}"))
+        self.conn.target.maybe_drop(self.conn)
+        return params
+
+    def nextset(self):
+        return False
+
+    def fetchall(self):
+        return [(self.conn.address,)]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, target, address):
+        self.target = target
+        self.address = address
+        self.open = True
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def isconnected(self):
+        return self.open
+
+    def close(self):
+        self.open = False
+
+
+class FakeTarget:
+    """Hosts HANA falsos: registra conexiones y permite simular caídas."""
+
+    def __init__(self):
+        self.connects = []
+        self.executed = []
+        self.down = set()
+        self.drop_on_execute = {}
+
+    def connect(self, **kwargs):
+        address = kwargs["address"]
+        self.connects.append(address)
+        if address in self.down:
+            raise RuntimeError(f"{address} unreachable")
+        return FakeConnection(self, address)
+
+    def maybe_drop(self, conn):
+        """`drop_on_execute[host]`: True cae siempre; un entero, sólo esas veces."""
+        drops = self.drop_on_execute.get(conn.address)
+        if not drops:
+            return
+        if drops is not True:
+            self.drop_on_execute[conn.address] = drops - 1
+        conn.open = False
+        raise RuntimeError("conn lost")
+
+
+@pytest.fixture
+def target(monkeypatch):
+    fake = FakeTarget()
+    monkeypatch.setattr(dbapi, "connect", fake.connect)
+    return fake
+
+
+@pytest.fixture
+def settings():
+    return Settings(
+        _env_file=None,
+        hana_host="primary",
+        hana_port=443,
+        hana_user="user",
+        hana_password="secret",
+        hana_read_host="replica",
+        hana_read_port=443,
+    )
+
+
+def _read_client(settings, **pool_kwargs):
+    pool = HanaConnectionPool(settings.hana_read_connection_kwargs(), **pool_kwargs)
+    return HanaClient(settings, pool=pool, fallback=HanaClient(settings)), pool
+
+
+def _rows_host(rows):
+    return rows[0]["HOST"]
+
+
+def test_env_example_loads(monkeypatch):
+    for key in list(os.environ):
+        if key.startswith("HANA_"):
+            monkeypatch.delenv(key)
+    settings = Settings(_env_file=os.path.join(ROOT, ".env.example"))
+    assert settings.hana_read_port is None
+    assert not settings.hana_read_enabled()
+
+
+def test_empty_env_values_are_ignored(monkeypatch):
+    monkeypatch.setenv("HANA_READ_PORT", "")
+    assert Settings(_env_file=None).hana_read_port is None
+
+
+def test_read_kwargs_inherit_primary_credentials(settings):
+    kwargs = settings.hana_read_connection_kwargs()
+    assert kwargs["address"] == "replica"
+    assert kwargs["user"] == "user"
+    assert kwargs["password"] == "secret"
+
+
+def test_route_overrides_map():
+    settings = Settings(
+        _env_file=None,
+        hana_route_overrides=" list_ee_site=primary, /snbrns-hub/x=READ,bad=other,noequals ",
+    )
+    assert settings.hana_route_overrides_map() == {"list_ee_site": "primary", "/snbrns-hub/x": "read"}
+
+
+def test_vcap_splits_primary_and_read_only():
+    vcap = {
+        "hana": [
+            {"name": "snbrns-hana-replica", "credentials": {"host": "replica"}},
+            {"name": "snbrns-hana", "credentials": {"host": "primary"}},
+        ]
+    }
+    assert _extract_hana_from_vcap(vcap)["host"] == "primary"
+    assert _extract_hana_read_from_vcap(vcap)["host"] == "replica"
+
+
+def test_vcap_read_only_tag_matches_exactly():
+    vcap = {
+        "hana": [
+            {"name": "a", "tags": ["hana", "read-only"], "credentials": {"host": "replica"}},
+            {"name": "b", "tags": ["hana", "read-only-ish"], "credentials": {"host": "primary"}},
+        ]
+    }
+    assert _extract_hana_from_vcap(vcap)["host"] == "primary"
+    assert _extract_hana_read_from_vcap(vcap)["host"] == "replica"
+
+
+def test_vcap_name_substring_is_not_a_marker():
+    vcap = {"hana": [{"name": "snbrns-hana-replication-hdi", "credentials": {"host": "primary"}}]}
+    assert _extract_hana_from_vcap(vcap)["host"] == "primary"
+    assert _extract_hana_read_from_vcap(vcap) is None
+
+
+def test_vcap_only_marked_instance_stays_primary():
+    vcap = {"hana": [{"name": "snbrns-hana-replica", "credentials": {"host": "only"}}]}
+    assert _extract_hana_from_vcap(vcap)["host"] == "only"
+    assert _extract_hana_read_from_vcap(vcap) is None
+
+
+def test_load_settings_reads_vcap_read_endpoint(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    vcap = {
+        "hana": [
+            {"name": "snbrns-hana", "credentials": {"host": "primary", "port": "443", "user": "u"}},
+            {"name": "snbrns-hana", "tags": ["replica"], "credentials": {"host": "replica", "port": "30015"}},
+        ]
+    }
+    monkeypatch.setenv("VCAP_SERVICES", json.dumps(vcap))
+    settings = load_settings()
+    assert settings.hana_host == "primary"
+    assert settings.hana_read_host == "replica"
+    assert settings.hana_read_port == 30015
+    assert settings.hana_read_enabled()
+
+
+def test_read_client_reuses_pooled_connection(target, settings):
+    client, _ = _read_client(settings)
+    assert _rows_host(client.execute_query("SELECT 1")) == "replica"
+    assert _rows_host(client.execute_query("SELECT 1")) == "replica"
+    assert target.connects == ["replica"]
+
+
+def test_connect_failure_falls_back_and_waits_retry_window(target, settings):
+    target.down.add("replica")
+    client, pool = _read_client(settings, retry_seconds=60)
+    assert _rows_host(client.execute_query("SELECT 1")) == "primary"
+    assert not pool.healthy
+    assert _rows_host(client.execute_query("SELECT 1")) == "primary"
+    assert target.connects.count("replica") == 1
+
+
+def test_retry_window_expiry_returns_to_secondary(target, settings):
+    target.down.add("replica")
+    client, pool = _read_client(settings, retry_seconds=0)
+    assert _rows_host(client.execute_query("SELECT 1")) == "primary"
+    target.down.clear()
+    assert pool.healthy
+    assert _rows_host(client.execute_query("SELECT 1")) == "replica"
+
+
+def test_lost_pooled_connection_marks_unhealthy_and_retries_on_primary(target, settings):
+    client, pool = _read_client(settings, retry_seconds=60)
+    client.execute_query("SELECT 1")
+    target.drop_on_execute["replica"] = True
+    assert _rows_host(client.execute_query("SELECT 1")) == "primary"
+    assert not pool.healthy
+
+
+def test_sql_error_does_not_mark_unhealthy(target, settings):
+    client, pool = _read_client(settings)
+    with pytest.raises(HanaClientError):
+        client.execute_query("SELECT BAD")
+    assert pool.healthy
+    assert ("primary", "SELECT BAD") not in target.executed
+
+
+def test_pool_bounds_connections_in_use(target, settings):
+    pool = HanaConnectionPool(settings.hana_read_connection_kwargs(), max_size=1, timeout=0)
+    conn = pool.acquire()
+    with pytest.raises(HanaClientError):
+        pool.acquire()
+    assert pool.healthy
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+
+def test_exhausted_pool_does_not_fall_back(target, settings):
+    client, pool = _read_client(settings, max_size=1, timeout=0)
+    held = pool.acquire()
+    with pytest.raises(HanaClientError):
+        client.execute_query("SELECT 1")
+    pool.release(held)
+    assert "primary" not in target.connects
+
+
+def test_stale_pooled_connection_retries_on_fresh_replica(target, settings):
+    client, pool = _read_client(settings, retry_seconds=60)
+    client.execute_query("SELECT 1")
+    target.drop_on_execute["replica"] = 1
+    assert _rows_host(client.execute_query("SELECT 1")) == "replica"
+    assert pool.healthy
+    assert target.connects == ["replica", "replica"]
+
+
+def test_fresh_connect_failure_after_stale_falls_back(target, settings):
+    client, pool = _read_client(settings, retry_seconds=60)
+    client.execute_query("SELECT 1")
+    target.drop_on_execute["replica"] = 1
+    target.down.add("replica")
+    assert _rows_host(client.execute_query("SELECT 1")) == "primary"
+    assert not pool.healthy
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path, target):
+    """TestClient sobre `app.main.app` con primario y secundario falsos."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("VCAP_SERVICES", raising=False)
+    for key, value in {
+        "HANA_HOST": "primary",
+        "HANA_PORT": "443",
+        "HANA_READ_HOST": "replica",
+        "HANA_READ_PORT": "443",
+        "HANA_ROUTE_OVERRIDES": "",
+    }.items():
+        monkeypatch.setenv(key, value)
+
+    def configure(**env):
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        dependencies.get_settings.cache_clear()
+        dependencies.get_hana_read_pool.cache_clear()
+        target.connects.clear()
+        return TestClient(app)
+
+    yield configure
+    dependencies.get_settings.cache_clear()
+    dependencies.get_hana_read_pool.cache_clear()
+
+
+SP_01 = {"param1": 1, "param2": "ABC"}
+
+
+def test_api_routes_reads_to_replica_and_procedures_to_primary(api, target):
+    client = api()
+    response = client.get("/snbrns-hub/hana/sql/ee-site?limit=1")
+    assert response.status_code == 200
+    assert response.json()["rows"] == [{"HOST": "replica"}]
+    assert client.post("/snbrns-hub/hana/procedures/sp-snbrs-01", json=SP_01).status_code == 200
+    assert target.connects == ["replica", "primary"]
+
+
+def test_api_full_path_overrides(api, target):
+    client = api(
+        HANA_ROUTE_OVERRIDES="/snbrns-hub/hana/sql/ee-site=primary,/snbrns-hub/hana/procedures/sp-snbrs-01=read"
+    )
+    assert client.get("/snbrns-hub/hana/sql/ee-site?limit=1").json()["rows"] == [{"HOST": "primary"}]
+    assert client.post("/snbrns-hub/hana/procedures/sp-snbrs-01", json=SP_01).status_code == 200
+    assert target.connects == ["primary", "replica"]
+
+
+def test_api_function_name_override(api, target):
+    client = api(HANA_ROUTE_OVERRIDES="list_ee_site=primary")
+    assert client.get("/snbrns-hub/hana/sql/ee-site?limit=1").json()["rows"] == [{"HOST": "primary"}]
+
+
+def test_api_without_read_endpoint_uses_primary(api, target, monkeypatch):
+    monkeypatch.delenv("HANA_READ_HOST")
+    client = api()
+    assert client.get("/snbrns-hub/hana/sql/ee-site?limit=1").json()["rows"] == [{"HOST": "primary"}]